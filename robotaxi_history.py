@@ -10,6 +10,8 @@ Usage:
 
   Step 2: Run with callback URL to complete auth and fetch history
           python robotaxi_history.py "https://auth.tesla.com/void/callback?code=..."
+
+  Pass --pretty to write the raw JSON export indented instead of compact.
 """
 
 import csv
@@ -18,17 +20,25 @@ import base64
 import secrets
 import json
 import sys
-import os
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from urllib.parse import urlencode, urlparse, parse_qs
+from itertools import chain
+from pathlib import Path
+from urllib.parse import urlencode, urlparse, parse_qsl
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     print("Error: 'requests' library required. Install with: pip install requests")
     sys.exit(1)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # Tesla OAuth2 Configuration
 AUTH_BASE_URL = "https://auth.tesla.com/oauth2/v3"
@@ -44,30 +54,65 @@ API_ENDPOINTS = [
 
 PAGE_SIZE = 100
 
+# Seconds to wait for a ride history response before trying other endpoints
+REQUEST_TIMEOUT = 10
+
+# Seconds to wait for an endpoint to answer a HEAD probe
+PROBE_TIMEOUT = 3
+
+# Write buffer for CSV exports
+CSV_BUFFER_SIZE = 1 << 20
+
+# Maximum number of ride history pages requested at once
+MAX_CONCURRENT_PAGES = 4
+
+# Shared session so every request reuses keep-alive connections. HTTP/1.1
+# keep-alive with one connection per concurrent page is enough for the few
+# pages an account has, so HTTP/2 (httpx + h2) isn't worth the dependency.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENT_PAGES))
+
+# Headers sent with every ride history request
+API_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "*/*",
+    "Accept-Language": "en-US",
+    "charset": "utf-8",
+    "cache-control": "no-cache",
+    "X-Tesla-User-Agent": "TeslaApp/4.36.5-2659/abc123/ios/18.0",
+}
+
+# Query parameters sent with every ride history request
+BASE_PARAMS = {
+    "deviceLanguage": "en",
+    "deviceCountry": "US",
+    "ttpLocale": "en_US",
+}
+
 # Config files stored in home directory
-PKCE_FILE = os.path.expanduser("~/.robotaxi_pkce.json")
-TOKENS_FILE = os.path.expanduser("~/.robotaxi_tokens.json")
+HOME = Path.home()
+PKCE_FILE = HOME / ".robotaxi_pkce.json"
+TOKENS_FILE = HOME / ".robotaxi_tokens.json"
 
 
 def generate_pkce_pair():
     """Generate PKCE code verifier and challenge."""
-    code_verifier = secrets.token_urlsafe(32)
-    code_challenge = base64.urlsafe_b64encode(
-        hashlib.sha256(code_verifier.encode()).digest()
-    ).decode().rstrip('=')
-    return code_verifier, code_challenge
+    code_verifier = base64.urlsafe_b64encode(secrets.token_bytes(32)).rstrip(b'=')
+    # A SHA-256 digest always encodes to 43 base64 chars plus one '=' pad
+    code_challenge = base64.urlsafe_b64encode(hashlib.sha256(code_verifier).digest())[:43]
+    return code_verifier.decode('ascii'), code_challenge.decode('ascii')
 
 
 def save_pkce(code_verifier):
     """Save PKCE verifier for later use."""
-    with open(PKCE_FILE, 'w') as f:
+    with PKCE_FILE.open('w') as f:
         json.dump({"code_verifier": code_verifier}, f)
 
 
 def load_pkce():
     """Load PKCE verifier."""
     try:
-        with open(PKCE_FILE, 'r') as f:
+        with PKCE_FILE.open('r') as f:
             data = json.load(f)
             return data.get('code_verifier')
     except (FileNotFoundError, json.JSONDecodeError):
@@ -77,7 +122,7 @@ def load_pkce():
 def clear_pkce():
     """Remove PKCE file after use."""
     try:
-        os.remove(PKCE_FILE)
+        PKCE_FILE.unlink()
     except FileNotFoundError:
         pass
 
@@ -125,14 +170,12 @@ def complete_auth(callback_url):
         sys.exit(1)
 
     parsed = urlparse(callback_url)
-    params = parse_qs(parsed.query)
+    auth_code = next((value for key, value in parse_qsl(parsed.query) if key == 'code'), None)
 
-    if 'code' not in params:
+    if auth_code is None:
         print("Error: No authorization code found in URL")
         sys.exit(1)
 
-    auth_code = params['code'][0]
-
     token_url = f"{AUTH_BASE_URL}/token"
     token_data = {
         "grant_type": "authorization_code",
@@ -144,7 +187,7 @@ def complete_auth(callback_url):
 
     print("Exchanging authorization code for access token...")
 
-    response = requests.post(token_url, data=token_data, headers={
+    response = SESSION.post(token_url, data=token_data, headers={
         "Content-Type": "application/x-www-form-urlencoded",
     })
 
@@ -170,7 +213,7 @@ def authenticate_with_refresh_token(refresh_token):
         "refresh_token": refresh_token,
     }
 
-    response = requests.post(token_url, data=token_data, headers={
+    response = SESSION.post(token_url, data=token_data, headers={
         "Content-Type": "application/x-www-form-urlencoded",
     })
 
@@ -181,113 +224,217 @@ def authenticate_with_refresh_token(refresh_token):
     return tokens.get('access_token'), tokens.get('refresh_token')
 
 
-def get_ride_history(access_token, page=1, working_endpoint=None):
-    """Fetch ride history from Tesla API."""
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-        "Accept": "*/*",
-        "Accept-Language": "en-US",
-        "charset": "utf-8",
-        "cache-control": "no-cache",
-        "X-Tesla-User-Agent": "TeslaApp/4.36.5-2659/abc123/ios/18.0",
-    }
+def parse_json(response):
+    """Decode a JSON response body, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
 
-    params = {
-        "pageNo": page,
-        "deviceLanguage": "en",
-        "deviceCountry": "US",
-        "ttpLocale": "en_US",
-    }
 
-    if working_endpoint:
-        base_url, endpoint = working_endpoint
-        url = f"{base_url}{endpoint}"
-        response = requests.get(url, headers=headers, params=params)
+def dumps_json(obj, pretty=False):
+    """Encode obj to JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(',', ':')).encode()
 
-        if response.status_code == 401:
-            print("Error: Authentication expired or invalid")
-            return None, None
-        elif response.status_code != 200:
-            print(f"Error: {response.status_code}")
-            return None, None
 
-        return response.json(), working_endpoint
+def request_ride_page(working_endpoint, headers, params):
+    """GET one ride history page, returning None if the request fails."""
+    base_url, endpoint = working_endpoint
+    try:
+        return SESSION.get(f"{base_url}{endpoint}", headers=headers, params=params, timeout=REQUEST_TIMEOUT)
+    except requests.exceptions.RequestException:
+        return None
 
-    for base_url, endpoint in API_ENDPOINTS:
-        url = f"{base_url}{endpoint}"
-        try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            if response.status_code == 200:
-                return response.json(), (base_url, endpoint)
-        except requests.exceptions.RequestException:
-            continue
 
-    print("Error: No working API endpoint found")
-    return None, None
+def get_ride_history(access_token, page=1, working_endpoint=None, probe=True):
+    """Fetch ride history from Tesla API.
 
+    Returns (data, working_endpoint, error). Nothing is printed here since
+    later pages are fetched on worker threads; error is a message for the
+    caller to show, or None on success. With probe=False a failure on
+    working_endpoint is reported instead of trying the other endpoints.
+    """
+    headers = {"Authorization": f"Bearer {access_token}", **API_HEADERS}
+    params = {"pageNo": page, **BASE_PARAMS}
+
+    if working_endpoint:
+        response = request_ride_page(working_endpoint, headers, params)
+
+        if response is None:
+            error = "Error: Request failed"
+        elif response.status_code == 200:
+            return parse_json(response), working_endpoint, None
+        elif response.status_code == 401:
+            return None, None, "Error: Authentication expired or invalid"
+        else:
+            error = f"Error: {response.status_code}"
+
+        # Anything but bad credentials may just mean a dead cached endpoint
+        if not probe:
+            return None, None, error
+
+    # Probe the remaining endpoints with cheap HEAD requests in parallel and
+    # only download the page from whichever answers first
+    executor = ThreadPoolExecutor(max_workers=len(API_ENDPOINTS))
+    futures = {
+        executor.submit(
+            SESSION.head, f"{base_url}{endpoint}",
+            headers=headers, timeout=PROBE_TIMEOUT,
+        ): (base_url, endpoint)
+        for base_url, endpoint in API_ENDPOINTS
+        if (base_url, endpoint) != working_endpoint
+    }
+    unresponsive = []
+    try:
+        for future in as_completed(futures):
+            candidate = futures[future]
+            try:
+                alive = future.result().status_code < 500
+            except requests.exceptions.RequestException:
+                alive = False
+
+            if not alive:
+                unresponsive.append(candidate)
+                continue
+
+            response = request_ride_page(candidate, headers, params)
+            if response is not None and response.status_code == 200:
+                return parse_json(response), candidate, None
+    finally:
+        # Don't wait for slower endpoints once we have an answer
+        executor.shutdown(wait=False)
+
+    # HEAD is only a hint, so still try endpoints that failed it
+    for candidate in unresponsive:
+        response = request_ride_page(candidate, headers, params)
+        if response is not None and response.status_code == 200:
+            return parse_json(response), candidate, None
+
+    return None, None, "Error: No working API endpoint found"
+
+
+def extract_rides(data):
+    """Extract the list of rides from a ride history response."""
+    # Handle response format: {"code":200,"data":{"rides":[...]}}
+    if isinstance(data, dict) and 'data' in data and isinstance(data['data'], dict):
+        return data['data'].get('rides', [])
+    elif isinstance(data, dict):
+        return data.get('rides', data.get('data', []))
+    else:
+        return data if isinstance(data, list) else []
 
-def fetch_all_rides(access_token):
-    """Fetch all ride history pages."""
-    all_rides = []
-    page = 1
-    working_endpoint = None
 
+def iter_ride_pages(access_token, working_endpoint=None):
+    """Fetch ride history pages, yielding (rides, working_endpoint) in order.
+
+    working_endpoint may be passed in from a previous run to skip probing
+    API_ENDPOINTS. Later pages are fetched in the background while the
+    caller handles the current one. Page 1 is yielded even when empty, so
+    callers can tell an empty history from a failed request.
+    """
     print("\nFetching ride history...")
 
-    while True:
-        print(f"  Page {page}...", end=" ", flush=True)
-        data, working_endpoint = get_ride_history(access_token, page, working_endpoint)
+    # Fetch the first page on its own to confirm a working endpoint
+    print("  Page 1...", end=" ", flush=True)
+    data, working_endpoint, error = get_ride_history(access_token, 1, working_endpoint)
 
-        if data is None:
-            break
+    if data is None:
+        print(error)
+        return
 
-        # Handle response format: {"code":200,"data":{"rides":[...]}}
-        if isinstance(data, dict) and 'data' in data and isinstance(data['data'], dict):
-            rides = data['data'].get('rides', [])
-        elif isinstance(data, dict):
-            rides = data.get('rides', data.get('data', []))
-        else:
-            rides = data if isinstance(data, list) else []
+    rides = extract_rides(data)
+    if not rides:
+        print("done")
+        yield rides, working_endpoint
+        return
+
+    print(f"{len(rides)} rides")
+    yield rides, working_endpoint
+
+    if len(rides) < PAGE_SIZE:
+        return
+
+    # Keep a window of pages in flight, consuming results in page order.
+    # Only page 1 probes endpoints; later pages report failures instead.
+    executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_PAGES)
+    pending = {}
+    next_page = 2
+    for _ in range(MAX_CONCURRENT_PAGES):
+        pending[next_page] = executor.submit(
+            get_ride_history, access_token, next_page, working_endpoint, False
+        )
+        next_page += 1
+
+    page = 2
+    try:
+        while True:
+            print(f"  Page {page}...", end=" ", flush=True)
+            data, _, error = pending.pop(page).result()
+
+            if data is None:
+                print(error)
+                break
+
+            rides = extract_rides(data)
+            if not rides:
+                print("done")
+                break
+
+            print(f"{len(rides)} rides")
 
-        if not rides:
-            print("done")
-            break
+            if len(rides) < PAGE_SIZE:
+                yield rides, working_endpoint
+                break
 
-        print(f"{len(rides)} rides")
-        all_rides.extend(rides)
+            pending[next_page] = executor.submit(
+                get_ride_history, access_token, next_page, working_endpoint, False
+            )
+            next_page += 1
+            page += 1
 
-        if len(rides) < PAGE_SIZE:
-            break
+            yield rides, working_endpoint
+    finally:
+        # Pages past the end are not needed; don't wait for ones already
+        # in flight, their results are simply dropped
+        for future in pending.values():
+            future.cancel()
+        executor.shutdown(wait=False)
 
-        page += 1
 
-    return all_rides
+# Duration formats indexed by (hours > 0) << 1 | (minutes > 0)
+DURATION_FORMATS = (
+    "{2}s",
+    "{1}m {2}s",
+    "{0}h {1}m {2}s",
+    "{0}h {1}m {2}s",
+)
 
 
 def format_duration(seconds):
     """Format duration in seconds to human-readable string."""
     if seconds is None:
         return ""
-    try:
-        seconds = int(seconds)
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        secs = seconds % 60
-        if hours > 0:
-            return f"{hours}h {minutes}m {secs}s"
-        elif minutes > 0:
-            return f"{minutes}m {secs}s"
-        else:
-            return f"{secs}s"
-    except (ValueError, TypeError):
-        return str(seconds)
+    if not isinstance(seconds, int):
+        try:
+            seconds = int(seconds)
+        except (ValueError, TypeError):
+            return str(seconds)
+    minutes, secs = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return DURATION_FORMATS[(hours > 0) << 1 | (minutes > 0)].format(hours, minutes, secs)
 
 
 def format_timestamp(ts):
     """Format ISO timestamp to readable format."""
     if not ts:
         return ""
+    # The API sends YYYY-MM-DDTHH:MM:SS[.fff]Z, which only needs slicing
+    if (isinstance(ts, str) and len(ts) >= 19 and ts[10] == 'T'
+            and ts[4] == ts[7] == '-' and ts[13] == ts[16] == ':'):
+        return ts[:10] + ' ' + ts[11:19]
     try:
         dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
         return dt.strftime("%Y-%m-%d %H:%M:%S")
@@ -295,116 +442,196 @@ def format_timestamp(ts):
         return str(ts)
 
 
-def export_to_csv(rides, filename):
-    """Export rides to CSV file with all available fields."""
-    if not rides:
-        print("No rides to export")
-        return
+# All fields from the API response, in CSV column order
+CSV_FIELDNAMES = (
+    "rideIntegerId",
+    "rideId",
+    "state",
+    "status",
+    "rideRequestedAt",
+    "rideStartedAt",
+    "rideCompletedAt",
+    "timestamp",
+    "pickupLocationName",
+    "pickupLocationLatitude",
+    "pickupLocationLongitude",
+    "pickupLocationTimezone",
+    "dropoffLocationName",
+    "dropoffLocationLatitude",
+    "dropoffLocationLongitude",
+    "dropoffLocationTimezone",
+    "dropoffLocationAddressId",
+    "totalDistanceMiles",
+    "driveDistanceMiles",
+    "billedDistanceMiles",
+    "totalDurationSeconds",
+    "driveDurationSeconds",
+    "totalDue",
+    "totalDueTaxExcl",
+    "estimatedPrice",
+    "estimatedPriceCurrencyCode",
+    "currencyCode",
+    "rideFeeStatus",
+    "rideFeeProcessFlag",
+    "hasAdhocFee",
+    "vin",
+    "licensePlate",
+    "vehicleModel",
+    "countryCode",
+    "priceBookGuid",
+    "quoteId",
+    "txid",
+    "route",
+    "routeImageUrl",
+    "rideEta",
+    "fleetCongestionPercent",
+    "isValid",
+    "invalidReason",
+    "billOverrideReason",
+    "disputeReason",
+    "disputeComment",
+    "billingUserId",
+    "billingUserUuid",
+    "billingUserAddressId",
+    "riderSsoId",
+)
+
+
+def make_row_getter(fieldnames):
+    """Build a function returning a ride's values for fieldnames as a tuple.
+
+    The function is generated with one dict.get per field unrolled into a
+    single tuple expression, so no per-field loop runs for each ride.
+    Missing fields default to ''.
+    """
+    values = "".join(f"_get(ride, {field!r}, ''), " for field in fieldnames)
+    source = f"def row(ride, _get=dict.get):\n    return ({values})\n"
+    namespace = {}
+    exec(source, namespace)
+    return namespace['row']
+
+
+def export_rides(pages, csv_filename, json_filename, pretty=False):
+    """Export ride pages to CSV and raw JSON as they arrive.
+
+    pages is an iterable of (rides, working_endpoint) pairs, as yielded by
+    iter_ride_pages. Each page is written to both files and then dropped,
+    so memory use does not grow with ride count. The files only appear
+    under their final names once every page has been written.
+
+    Returns the number of rides written.
+    """
+    row = make_row_getter(CSV_FIELDNAMES)
+    total = 0
+
+    # Pretty output matches json.dump(rides, indent=2); JSON strings never
+    # contain raw newlines, so indenting each ride one level is safe
+    if pretty:
+        open_array, separator, close_array = b'[\n  ', b',\n  ', b'\n]'
+    else:
+        open_array, separator, close_array = b'[', b',', b']'
 
-    # All fields from the API response
-    fieldnames = [
-        "rideIntegerId",
-        "rideId",
-        "state",
-        "status",
-        "rideRequestedAt",
-        "rideStartedAt",
-        "rideCompletedAt",
-        "timestamp",
-        "pickupLocationName",
-        "pickupLocationLatitude",
-        "pickupLocationLongitude",
-        "pickupLocationTimezone",
-        "dropoffLocationName",
-        "dropoffLocationLatitude",
-        "dropoffLocationLongitude",
-        "dropoffLocationTimezone",
-        "dropoffLocationAddressId",
-        "totalDistanceMiles",
-        "driveDistanceMiles",
-        "billedDistanceMiles",
-        "totalDurationSeconds",
-        "driveDurationSeconds",
-        "totalDue",
-        "totalDueTaxExcl",
-        "estimatedPrice",
-        "estimatedPriceCurrencyCode",
-        "currencyCode",
-        "rideFeeStatus",
-        "rideFeeProcessFlag",
-        "hasAdhocFee",
-        "vin",
-        "licensePlate",
-        "vehicleModel",
-        "countryCode",
-        "priceBookGuid",
-        "quoteId",
-        "txid",
-        "route",
-        "routeImageUrl",
-        "rideEta",
-        "fleetCongestionPercent",
-        "isValid",
-        "invalidReason",
-        "billOverrideReason",
-        "disputeReason",
-        "disputeComment",
-        "billingUserId",
-        "billingUserUuid",
-        "billingUserAddressId",
-        "riderSsoId",
-    ]
-
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
-        writer.writeheader()
-
-        for ride in rides:
-            # Write all fields directly from the API response
-            row = {field: ride.get(field, '') for field in fieldnames}
-            writer.writerow(row)
-
-    print(f"Exported {len(rides)} rides to {filename}")
-
-
-def save_tokens(access_token, refresh_token):
-    """Save tokens to file for reuse."""
-    with open(TOKENS_FILE, 'w') as f:
+    # Write under temporary names so an interrupted export leaves nothing
+    # half-written behind
+    csv_part = Path(f"{csv_filename}.part")
+    json_part = Path(f"{json_filename}.part")
+
+    try:
+        with open(csv_part, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_SIZE) as csvfile, \
+                open(json_part, 'wb') as jsonfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(CSV_FIELDNAMES)
+
+            for rides, _ in pages:
+                # Write all fields directly from the API response, ignoring extras.
+                # csv.writer's C loop handles formatting and quoting faster than
+                # joining rows by hand, so no separate unquoted fast path is used.
+                writer.writerows(map(row, rides))
+
+                for ride in rides:
+                    jsonfile.write(separator if total else open_array)
+                    if pretty:
+                        jsonfile.write(dumps_json(ride, pretty=True).replace(b'\n', b'\n  '))
+                    else:
+                        jsonfile.write(dumps_json(ride))
+                    total += 1
+
+            jsonfile.write(close_array if total else b'[]')
+    except BaseException:
+        for part in (csv_part, json_part):
+            try:
+                part.unlink()
+            except FileNotFoundError:
+                pass
+        print(f"\nExport interrupted after {total} rides; no files were written.")
+        raise
+
+    csv_part.replace(csv_filename)
+    json_part.replace(json_filename)
+
+    return total
+
+
+def save_tokens(access_token, refresh_token, working_endpoint=None):
+    """Save tokens and the last working API endpoint to file for reuse."""
+    with TOKENS_FILE.open('w') as f:
         json.dump({
             "access_token": access_token,
             "refresh_token": refresh_token,
+            "working_endpoint": list(working_endpoint) if working_endpoint else None,
             "saved_at": datetime.now().isoformat()
         }, f)
 
 
 def load_tokens():
-    """Load tokens from file."""
+    """Load tokens and the cached API endpoint from file."""
     try:
-        with open(TOKENS_FILE, 'r') as f:
+        with TOKENS_FILE.open('r') as f:
             data = json.load(f)
-            return data.get('access_token'), data.get('refresh_token')
     except (FileNotFoundError, json.JSONDecodeError):
-        return None, None
+        return None, None, None
 
+    # Only trust a cached endpoint that is still one we know about
+    working_endpoint = data.get('working_endpoint')
+    if working_endpoint and tuple(working_endpoint) in API_ENDPOINTS:
+        working_endpoint = tuple(working_endpoint)
+    else:
+        working_endpoint = None
 
-def fetch_and_export(access_token, refresh_token):
-    """Fetch ride history and export to CSV."""
-    rides = fetch_all_rides(access_token)
+    return data.get('access_token'), data.get('refresh_token'), working_endpoint
 
-    if rides:
-        print(f"\nTotal rides: {len(rides)}")
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        csv_filename = f"robotaxi_history_{timestamp}.csv"
-        json_filename = f"robotaxi_history_{timestamp}.json"
+def fetch_and_export(access_token, refresh_token, working_endpoint=None, pretty=False):
+    """Fetch ride history and export to CSV and JSON."""
+    pages = iter_ride_pages(access_token, working_endpoint)
 
-        export_to_csv(rides, csv_filename)
+    first_page = next(pages, None)
+    if first_page is None:
+        # Page 1 failed everywhere, so don't send the next run back to a
+        # cached endpoint that may be the reason
+        if working_endpoint and refresh_token:
+            save_tokens(access_token, refresh_token)
+        print("\nNo ride history found.")
+        return
 
-        with open(json_filename, 'w') as f:
-            json.dump(rides, f, indent=2)
-        print(f"Raw JSON saved to {json_filename}")
-    else:
+    rides, new_endpoint = first_page
+    if new_endpoint != working_endpoint and refresh_token:
+        save_tokens(access_token, refresh_token, new_endpoint)
+
+    # Only create output files once there is something to write
+    if not rides:
         print("\nNo ride history found.")
+        return
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_filename = f"robotaxi_history_{timestamp}.csv"
+    json_filename = f"robotaxi_history_{timestamp}.json"
+
+    total = export_rides(chain([first_page], pages), csv_filename, json_filename, pretty)
+
+    print(f"\nTotal rides: {total}")
+    print(f"Exported {total} rides to {csv_filename}")
+    print(f"Raw JSON saved to {json_filename}")
 
 
 def main():
@@ -412,9 +639,11 @@ def main():
     print("ROBOTAXI RIDE HISTORY EXPORTER")
     print("=" * 60)
 
-    callback_url = sys.argv[1] if len(sys.argv) > 1 else None
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    pretty = '--pretty' in sys.argv[1:]
+    callback_url = args[0] if args else None
 
-    access_token, refresh_token = load_tokens()
+    access_token, refresh_token, working_endpoint = load_tokens()
 
     if access_token and refresh_token and not callback_url:
         print("\nRefreshing authentication...")
@@ -423,8 +652,8 @@ def main():
             access_token = new_access
             refresh_token = new_refresh or refresh_token
             print("Authenticated!")
-            save_tokens(access_token, refresh_token)
-            fetch_and_export(access_token, refresh_token)
+            save_tokens(access_token, refresh_token, working_endpoint)
+            fetch_and_export(access_token, refresh_token, working_endpoint, pretty)
             return
         else:
             print("Session expired, need to re-authenticate")
@@ -432,8 +661,8 @@ def main():
     if callback_url:
         access_token, refresh_token = complete_auth(callback_url)
         if refresh_token:
-            save_tokens(access_token, refresh_token)
-        fetch_and_export(access_token, refresh_token)
+            save_tokens(access_token, refresh_token, working_endpoint)
+        fetch_and_export(access_token, refresh_token, working_endpoint, pretty)
         return
 
     start_auth()
@@ -5,13 +5,54 @@ Simple development server that proxies Tesla API requests to avoid CORS issues.
 
 import json
 import os
+from http.client import HTTPSConnection
 from http.server import HTTPServer, SimpleHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError
+from urllib.parse import urlparse
 
 PORT = 8080
 
+AUTH_HOST = 'auth.tesla.com'
+API_HOSTS = [
+    'ownership.tesla.com',
+    'akamai-apigateway-charging-ownership.tesla.com',
+]
+RIDES_PATH = '/mobile-app/ride/history'
+
+# Upstream connections kept open across proxied requests, keyed by host
+_connections = {}
+
+
+def upstream_request(host, method, path, headers, body=None):
+    """Send a request over a persistent HTTPS connection to host.
+
+    Returns (status, body). A GET on a reused idle connection that the
+    server has since closed or reset is retried once on a new connection.
+    Other methods, such as the single-use token POST, are always sent on a
+    new connection and never retried.
+    """
+    for attempt in range(2):
+        conn = _connections.get(host)
+        if conn is None:
+            conn = _connections[host] = HTTPSConnection(host, timeout=30)
+        if method != 'GET':
+            # Closing just the socket makes http.client open a fresh one
+            conn.close()
+        reused = conn.sock is not None
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            return response.status, response.read()
+        except (ConnectionResetError, BrokenPipeError):
+            conn.close()
+            del _connections[host]
+            if attempt or not reused or method != 'GET':
+                raise
+        except Exception:
+            conn.close()
+            del _connections[host]
+            raise
+
+
 class ProxyHandler(SimpleHTTPRequestHandler):
     def do_POST(self):
         if self.path == '/api/token':
@@ -26,30 +67,35 @@ class ProxyHandler(SimpleHTTPRequestHandler):
             # Serve static files
             super().do_GET()
 
+    def copyfile(self, source, outputfile):
+        """Send static files with sendfile() where the platform supports it."""
+        # wfile is unbuffered, so the headers are already on the socket
+        self.connection.sendfile(source)
+
     def proxy_token_request(self):
         """Proxy token requests to Tesla OAuth endpoint."""
         try:
             content_length = int(self.headers.get('Content-Length', 0))
             body = self.rfile.read(content_length)
 
-            req = Request(
-                'https://auth.tesla.com/oauth2/v3/token',
-                data=body,
+            status, data = upstream_request(
+                AUTH_HOST,
+                'POST',
+                '/oauth2/v3/token',
                 headers={'Content-Type': 'application/x-www-form-urlencoded'},
-                method='POST'
+                body=body,
             )
 
-            with urlopen(req, timeout=30) as response:
-                data = response.read()
+            if status == 200:
                 self.send_response(200)
                 self.send_header('Content-Type', 'application/json')
                 self.send_header('Access-Control-Allow-Origin', '*')
                 self.end_headers()
                 self.wfile.write(data)
+                return
 
-        except HTTPError as e:
-            error_body = e.read().decode('utf-8', errors='replace')
-            self.send_response(e.code)
+            error_body = data.decode('utf-8', errors='replace')
+            self.send_response(status)
             self.send_header('Content-Type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
@@ -69,46 +115,35 @@ class ProxyHandler(SimpleHTTPRequestHandler):
             query = parsed.query
 
             # Try endpoints in order
-            endpoints = [
-                f'https://ownership.tesla.com/mobile-app/ride/history?{query}',
-                f'https://akamai-apigateway-charging-ownership.tesla.com/mobile-app/ride/history?{query}',
-            ]
-
-            for url in endpoints:
-                try:
-                    req = Request(url, headers={
-                        'Authorization': auth_header,
-                        'Content-Type': 'application/json',
-                        'Accept': '*/*',
-                        'X-Tesla-User-Agent': 'TeslaApp/4.36.5-2659/abc123/ios/18.0',
-                    })
-
-                    with urlopen(req, timeout=30) as response:
-                        data = response.read()
-                        self.send_response(200)
-                        self.send_header('Content-Type', 'application/json')
-                        self.send_header('Access-Control-Allow-Origin', '*')
-                        self.end_headers()
-                        self.wfile.write(data)
-                        return
-
-                except HTTPError as e:
-                    if e.code == 401:
-                        raise
-                    continue
+            for host in API_HOSTS:
+                status, data = upstream_request(host, 'GET', f'{RIDES_PATH}?{query}', headers={
+                    'Authorization': auth_header,
+                    'Content-Type': 'application/json',
+                    'Accept': '*/*',
+                    'X-Tesla-User-Agent': 'TeslaApp/4.36.5-2659/abc123/ios/18.0',
+                })
+
+                if status == 200:
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Access-Control-Allow-Origin', '*')
+                    self.end_headers()
+                    self.wfile.write(data)
+                    return
+
+                if status == 401:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Access-Control-Allow-Origin', '*')
+                    self.end_headers()
+                    self.wfile.write(json.dumps({'error': f'API error: {status}'}).encode())
+                    return
 
             self.send_response(502)
             self.send_header('Content-Type', 'application/json')
             self.end_headers()
             self.wfile.write(json.dumps({'error': 'No working endpoint'}).encode())
 
-        except HTTPError as e:
-            self.send_response(e.code)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps({'error': f'API error: {e.code}'}).encode())
-
         except Exception as e:
             self.send_response(500)
             self.send_header('Content-Type', 'application/json')